@@ -1,3 +1,4 @@
+import asyncio
 import re
 from faker.decode import unidecode
 from pathlib import Path
@@ -16,7 +17,10 @@ from assessments.processing import (
     process_archive_answers,
     create_parquet_from_answers,
 )
+from assessments.models import TerraformRating
+from assessments.cache import DEFAULT_CACHE_FILE, CorrectionCache
 from assessments.rating import AnswerRater
+from assessments.ratelimit import DEFAULT_MAX_RETRIES, PROVIDER_LIMITS, ProviderLimits, RateLimiter
 
 REPLACE_ID_REGEX = r"[\\ \[\]\?:]+"
 
@@ -46,25 +50,48 @@ def rate_answers(
     google_api_key: Annotated[Optional[str], typer.Option(help="Vertex AI API key", envvar="GOOGLE_API_KEY")] = None,
     output_file: Annotated[Path, typer.Argument(help="Path to the output parquet file")] = "ratings.parquet",
     only_student: Annotated[str | None, typer.Option(help="Only rate answers for a specific student")] = None,
+    concurrency: Annotated[int, typer.Option(min=1, help="Maximum number of LLM calls in flight")] = 1,
+    requests_per_minute: Annotated[Optional[int], typer.Option(min=1, help="Provider request quota (default: per provider)")] = None,
+    tokens_per_minute: Annotated[Optional[int], typer.Option(min=1, help="Provider token quota (default: per provider)")] = None,
+    max_retries: Annotated[int, typer.Option(min=0, help="Retries of a throttled or failed LLM call")] = DEFAULT_MAX_RETRIES,
+    cache_file: Annotated[Path, typer.Option(help="Cache of LLM corrections, reused across runs")] = DEFAULT_CACHE_FILE,
+    no_cache: Annotated[bool, typer.Option("--no-cache", help="Call the LLM for every answer, without reading or writing the cache")] = False,
 ):
     rich.print(f"Loading input parquet from {input_file} ...")
     df = pl.read_parquet(input_file)
 
     if mistral_api_key:
         llm = ChatMistralAI(model=llm_model, api_key=mistral_api_key)
+        provider = "mistral"
     elif google_api_key:
-        llm = ChatGoogleGenerativeAI(model=llm_model, api_key=google_api_key)
+        # A single attempt, so that throttling reaches the rate limiter
+        llm = ChatGoogleGenerativeAI(model=llm_model, api_key=google_api_key, max_retries=1)
+        provider = "google"
     else:
         rich.print("[red]Error:[/red] Please provide either Mistral API key or Google API key")
         raise typer.Exit(1)
 
-    rater = AnswerRater(llm=llm)
+    limits = PROVIDER_LIMITS[provider]
+    limiter = RateLimiter(
+        ProviderLimits(
+            requests_per_minute=requests_per_minute or limits.requests_per_minute,
+            tokens_per_minute=tokens_per_minute or limits.tokens_per_minute,
+        ),
+        max_concurrency=concurrency,
+        max_retries=max_retries,
+    )
+    cache = None if no_cache else CorrectionCache(cache_file)
+    rater = AnswerRater(llm=llm, limiter=limiter, cache=cache)
 
     if only_student:
         df = df.filter(pl.col("username") == only_student)
         if df.is_empty():
             raise ValueError(f"No rows found for student {only_student}")
-    results = [rater.rate_student_answers(row) for row in df.to_dicts()]
+    results = asyncio.run(rate_all_answers(rater, df.to_dicts(), concurrency))
+    rich.print(limiter.summary())
+    if cache:
+        rich.print(cache.summary())
+        cache.close()
 
     rich.print(f"Generating parquet output to {output_file} ...")
     output_df = pl.DataFrame(results)
@@ -75,6 +102,60 @@ def rate_answers(
     output_df.write_parquet(output_file)
     rich.print("Done.")
 
+async def rate_all_answers(rater: AnswerRater, rows: list[dict], concurrency: int) -> list[dict]:
+    """Rate every student's answers, with at most `concurrency` LLM calls at once.
+
+    Results are in the order of `rows`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *(rater.arate_student_answers(row, semaphore=semaphore) for row in rows)
+    )
+
+def terraform_result_row(username: str, rating: TerraformRating | Exception, terraform_criterias: list[dict]) -> dict:
+    result_row = {"username": username}
+    for criteria in terraform_criterias:
+        name = criteria["name"]
+        if isinstance(rating, Exception):
+            result_row[name] = json.dumps(
+                {
+                    "note": 0.0,
+                    "justification": "Error during correction",
+                    "commentaire": str(rating),
+                },
+                ensure_ascii=False,
+            )
+            continue
+        correction = rating.criterias.get(name)
+        result_row[name] = (
+            json.dumps(correction.model_dump(), ensure_ascii=False)
+            if correction
+            else None
+        )
+    return result_row
+
+async def rate_all_terraform(rater: AnswerRater, rows: list[dict], terraform_criterias: list[dict], concurrency: int) -> list[dict]:
+    """Rate every student's Terraform code, with at most `concurrency` LLM calls at once.
+
+    Results are in the order of `rows`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def rate(row: dict) -> dict:
+        username = row["username"]
+        rich.print(f"Rating Terraform for student: [blue]{username}[/blue]")
+        student_code = row.get("terraform", "")
+        try:
+            async with semaphore:
+                rating = await rater.arate_terraform(student_code, terraform_criterias)
+            rich.print(f"Terraform correction for {username} done.")
+        except Exception as e:
+            rich.print(f"[red]Error rating Terraform for {username}: {e}[/red]")
+            rating = e
+        return terraform_result_row(username, rating, terraform_criterias)
+
+    return await asyncio.gather(*(rate(row) for row in rows))
+
 @app.command(name="rate_terraform")
 def rate_terraform(
     input_file: Annotated[Path, typer.Argument(help="Path to the input parquet file")],
@@ -83,19 +164,38 @@ def rate_terraform(
     google_api_key: Annotated[Optional[str], typer.Option(help="Vertex AI API key", envvar="GOOGLE_API_KEY")] = None,
     output_file: Annotated[Path, typer.Argument(help="Path to the output parquet file")] = "terraform_ratings.parquet",
     only_student: Annotated[str | None, typer.Option(help="Only rate answers for a specific student")] = None,
+    concurrency: Annotated[int, typer.Option(min=1, help="Maximum number of LLM calls in flight")] = 1,
+    requests_per_minute: Annotated[Optional[int], typer.Option(min=1, help="Provider request quota (default: per provider)")] = None,
+    tokens_per_minute: Annotated[Optional[int], typer.Option(min=1, help="Provider token quota (default: per provider)")] = None,
+    max_retries: Annotated[int, typer.Option(min=0, help="Retries of a throttled or failed LLM call")] = DEFAULT_MAX_RETRIES,
+    cache_file: Annotated[Path, typer.Option(help="Cache of LLM corrections, reused across runs")] = DEFAULT_CACHE_FILE,
+    no_cache: Annotated[bool, typer.Option("--no-cache", help="Call the LLM for every answer, without reading or writing the cache")] = False,
 ):
     rich.print(f"Loading input parquet from {input_file} ...")
     df = pl.read_parquet(input_file)
 
     if mistral_api_key:
         llm = ChatMistralAI(model=llm_model, api_key=mistral_api_key)
+        provider = "mistral"
     elif google_api_key:
-        llm = ChatGoogleGenerativeAI(model=llm_model, api_key=google_api_key)
+        # A single attempt, so that throttling reaches the rate limiter
+        llm = ChatGoogleGenerativeAI(model=llm_model, api_key=google_api_key, max_retries=1)
+        provider = "google"
     else:
         rich.print("[red]Error:[/red] Please provide either Mistral API key or Google API key")
         raise typer.Exit(1)
 
-    rater = AnswerRater(llm=llm)
+    limits = PROVIDER_LIMITS[provider]
+    limiter = RateLimiter(
+        ProviderLimits(
+            requests_per_minute=requests_per_minute or limits.requests_per_minute,
+            tokens_per_minute=tokens_per_minute or limits.tokens_per_minute,
+        ),
+        max_concurrency=concurrency,
+        max_retries=max_retries,
+    )
+    cache = None if no_cache else CorrectionCache(cache_file)
+    rater = AnswerRater(llm=llm, limiter=limiter, cache=cache)
 
     # Extract criteria from answers.json
     terraform_criterias = rater.answers_data.get("terraform_criterias", [])
@@ -105,38 +205,13 @@ def rate_terraform(
         if df.is_empty():
             raise ValueError(f"No rows found for student {only_student}")
 
-    results = []
-    for row in df.to_dicts():
-        username = row["username"]
-        rich.print(f"Rating Terraform for student: [blue]{username}[/blue]")
-        student_code = row.get("terraform", "")
-        try:
-            rating = rater.rate_terraform(student_code, terraform_criterias)
-            result_row = {"username": username}
-            for criteria in terraform_criterias:
-                name = criteria["name"]
-                correction = rating.criterias.get(name)
-                result_row[name] = (
-                    json.dumps(correction.model_dump(), ensure_ascii=False)
-                    if correction
-                    else None
-                )
-            results.append(result_row)
-            rich.print(f"Terraform correction for {username} done.")
-        except Exception as e:
-            rich.print(f"[red]Error rating Terraform for {username}: {e}[/red]")
-            result_row = {"username": username}
-            for criteria in terraform_criterias:
-                name = criteria["name"]
-                result_row[name] = json.dumps(
-                    {
-                        "note": 0.0,
-                        "justification": "Error during correction",
-                        "commentaire": str(e),
-                    },
-                    ensure_ascii=False,
-                )
-            results.append(result_row)
+    results = asyncio.run(
+        rate_all_terraform(rater, df.to_dicts(), terraform_criterias, concurrency)
+    )
+    rich.print(limiter.summary())
+    if cache:
+        rich.print(cache.summary())
+        cache.close()
 
     rich.print(f"Generating parquet output to {output_file} ...")
     output_df = pl.DataFrame(results)
@@ -0,0 +1,113 @@
+"""
+On-disk cache of LLM corrections.
+Entries are keyed by a hash of the model name, the output schema and the
+rendered messages (system prompt, then the user prompt holding the student
+answer), so a rerun only pays for the calls whose inputs changed. Entries
+older than `max_age_days` are evicted, then the least recently used ones
+beyond `max_entries`.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Type, TypeVar
+
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+DEFAULT_CACHE_FILE = Path("llm_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_AGE_DAYS = 90
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS corrections (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+)
+"""
+
+
+def cache_key(model: str, schema: Type[BaseModel], messages: List[BaseMessage]) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "schema": schema.model_json_schema(),
+            "messages": [[message.type, message.content] for message in messages],
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CorrectionCache:
+    """SQLite store of structured LLM outputs, with hit and miss counters."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_FILE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self.evict()
+
+    def get(self, model: str, schema: Type[M], messages: List[BaseMessage]) -> Optional[M]:
+        key = cache_key(model, schema, messages)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM corrections WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE corrections SET used_at = ? WHERE key = ?", (time.time(), key))
+        return schema.model_validate_json(row[0])
+
+    def put(self, model: str, schema: Type[BaseModel], messages: List[BaseMessage], value: BaseModel) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO corrections (key, model, value, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key(model, schema, messages), model, value.model_dump_json(), now, now),
+            )
+
+    def evict(self) -> int:
+        """Delete expired entries, then the least recently used beyond max_entries; return the count."""
+        with self._lock:
+            deleted = 0
+            if self.max_age_days is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM corrections WHERE created_at < ?",
+                    (time.time() - self.max_age_days * 86400,),
+                )
+                deleted += cursor.rowcount
+            cursor = self._conn.execute(
+                "DELETE FROM corrections WHERE key IN ("
+                "SELECT key FROM corrections ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            return deleted + cursor.rowcount
+
+    def close(self) -> None:
+        self.evict()
+        self._conn.close()
+
+    def summary(self) -> str:
+        return f"Cache {self.path}: {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,187 @@
+"""
+Client-side rate limiting of LLM calls.
+One RateLimiter is shared by every rating call to a provider: token buckets
+keep requests and tokens per minute under the provider's quota, throttled
+(HTTP 429) and transient failures are retried with exponential backoff and
+full jitter, and the number of calls in flight follows AIMD: halved when the
+provider throttles, grown by one after a window's worth of successes.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+import rich
+from langchain_core.messages import BaseMessage
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    requests_per_minute: int
+    tokens_per_minute: int
+
+
+# Overridden with --requests-per-minute and --tokens-per-minute for other tiers
+PROVIDER_LIMITS: Dict[str, ProviderLimits] = {
+    "mistral": ProviderLimits(requests_per_minute=60, tokens_per_minute=500_000),
+    "google": ProviderLimits(requests_per_minute=60, tokens_per_minute=1_000_000),
+}
+
+# Seconds of quota a bucket lets through at once
+BURST_SECONDS = 10
+# Characters per token when estimating the size of a prompt
+CHARS_PER_TOKEN = 4
+# Tokens reserved for the structured answer of a call
+COMPLETION_TOKENS = 1024
+DEFAULT_MAX_RETRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Return a rough count of the tokens a call with `messages` consumes."""
+    return sum(len(str(message.content)) for message in messages) // CHARS_PER_TOKEN + COMPLETION_TOKENS
+
+
+def _status_codes(error: Optional[BaseException]) -> Iterator[int]:
+    """Yield the HTTP status of `error` and of the errors it was raised from.
+
+    Mistral raises httpx.HTTPStatusError (response.status_code), Gemini wraps
+    google.genai errors (code) in its own exceptions.
+    """
+    while error is not None:
+        response = getattr(error, "response", None)
+        for status in (
+            getattr(response, "status_code", None),
+            getattr(error, "status_code", None),
+            getattr(error, "code", None),
+        ):
+            if isinstance(status, int):
+                yield status
+        error = error.__cause__
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """Return True if `error`, or the error it was raised from, is a provider rate limit."""
+    return any(status == 429 for status in _status_codes(error))
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Return True if the same call may succeed later: throttling or a server failure."""
+    return any(status == 429 or status >= 500 for status in _status_codes(error))
+
+
+class TokenBucket:
+    """Bucket of `capacity` units, refilled at `rate` units per second.
+
+    `reserve` takes the units at once, letting the level go negative, and
+    returns how long the caller has to wait before using them: callers are
+    served in reservation order without holding a lock while they sleep.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= min(amount, self.capacity)
+            return max(-self.level / self.rate, 0.0)
+
+
+class RateLimiter:
+    """Rate limits, retries and adapts the concurrency of calls to one provider."""
+
+    def __init__(
+        self,
+        limits: ProviderLimits,
+        max_concurrency: int = 1,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.limits = limits
+        self.requests = TokenBucket(
+            max(limits.requests_per_minute * BURST_SECONDS / 60, 1), limits.requests_per_minute / 60
+        )
+        self.tokens = TokenBucket(
+            max(limits.tokens_per_minute * BURST_SECONDS / 60, 1), limits.tokens_per_minute / 60
+        )
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        # AIMD window: calls allowed in flight, between 1 and max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self._in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _reserve(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def _succeeded(self) -> None:
+        self.calls += 1
+        self.concurrency = min(self.concurrency + 1 / self.concurrency, self.max_concurrency)
+
+    def _failed(self, error: Exception, attempt: int) -> float:
+        """Return the backoff before retrying the call, or raise `error` if it is final."""
+        if not is_retryable_error(error) or attempt == self.max_retries:
+            raise error
+        if is_throttling_error(error):
+            self.throttled += 1
+            self.concurrency = max(self.concurrency / 2, 1.0)
+        self.retries += 1
+        delay = random.uniform(0, min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX))
+        rich.print(
+            f"[yellow]Retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries}): {error}[/yellow]"
+        )
+        return delay
+
+    def run_sync(self, call: Callable[[], T], tokens: int) -> T:
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(tokens))
+            try:
+                result = call()
+            except Exception as e:
+                time.sleep(self._failed(e, attempt))
+            else:
+                self._succeeded()
+                return result
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int) -> T:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+        for attempt in range(self.max_retries + 1):
+            async with condition:
+                await condition.wait_for(lambda: self._in_flight < int(self.concurrency))
+                self._in_flight += 1
+            try:
+                await asyncio.sleep(self._reserve(tokens))
+                result = await call()
+            except Exception as e:
+                delay = self._failed(e, attempt)
+            else:
+                self._succeeded()
+                return result
+            finally:
+                async with condition:
+                    self._in_flight -= 1
+                    condition.notify_all()
+            await asyncio.sleep(delay)
+
+    def summary(self) -> str:
+        return (
+            f"{self.calls} LLM calls, {self.throttled} throttled, {self.retries} retried, "
+            f"final concurrency {int(self.concurrency)}/{self.max_concurrency}"
+        )
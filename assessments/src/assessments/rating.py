@@ -1,16 +1,23 @@
+import asyncio
 import json
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
 import rich
 from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import Runnable
 from langchain_mistralai import ChatMistralAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from pydantic import BaseModel
+from assessments.cache import CorrectionCache
 from assessments.models import AnswerCorrection, TerraformRating
+from assessments.ratelimit import RateLimiter, estimate_tokens
 
 resources_path = Path(__file__).parent.parent.parent / "resources"
 
+M = TypeVar("M", bound=BaseModel)
+
 
 class AnswerRater:
     answers_data: Dict[str, Any]
@@ -21,9 +28,19 @@ class AnswerRater:
     terraform_structured_llm: Runnable
     terraform_system_prompt: str
     terraform_user_prompt_template: str
-
-    def __init__(self, llm: BaseChatModel):
+    limiter: Optional[RateLimiter]
+    cache: Optional[CorrectionCache]
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        limiter: Optional[RateLimiter] = None,
+        cache: Optional[CorrectionCache] = None,
+    ):
         self.llm = llm
+        self.limiter = limiter
+        self.cache = cache
+        self.model_name = getattr(llm, "model", None) or type(llm).__name__
         self.structured_llm = self.llm.with_structured_output(AnswerCorrection)
         self.terraform_structured_llm = self.llm.with_structured_output(TerraformRating)
         self._load_resources()
@@ -47,32 +64,104 @@ class AnswerRater:
         correction_row = {"username": username}
 
         for i in range(num_questions):
-            answer_key = f"answer_{i}"
-            question_id = str(i + 1)
-            student_answer = student_row.get(answer_key, "")
-
-            q_info = self.answers_data.get(question_id)
+            q_info = self._question_info(i)
             if not q_info:
-                rich.print(f"[yellow]Warning: No info for question {question_id}[/yellow]")
                 correction_row[f"answer_correction_{i}"] = None
                 continue
 
             try:
-                correction = self.rate_single_answer(q_info, student_answer)
-                correction_row[f"answer_correction_{i}"] = json.dumps(correction.model_dump())
-                rich.print(f"Answer_{i}: {correction.model_dump()}")
+                correction = self.rate_single_answer(q_info, student_row.get(f"answer_{i}", ""))
+                correction_row[f"answer_correction_{i}"] = self._correction_json(i, correction)
             except Exception as e:
-                rich.print(f"[red]Error rating answer_{i} for {username}: {e}[/red]")
-                correction_row[f"answer_correction_{i}"] = json.dumps(
-                    {
-                        "note": 0.0,
-                        "justification": "Error during correction",
-                        "commentaire": str(e),
-                    }
-                )
+                correction_row[f"answer_correction_{i}"] = self._error_json(i, username, e)
         return correction_row
 
+    async def arate_student_answers(
+        self,
+        student_row: Dict[str, Any],
+        num_questions: int = 14,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Dict[str, Any]:
+        """Async version of rate_student_answers, rating all questions concurrently.
+
+        `semaphore` bounds the number of LLM calls in flight, and is meant to be
+        shared by every student rated at the same time. Columns are filled in
+        question order whatever order the calls complete in.
+        """
+        username = student_row["username"]
+        rich.print(f"Rating answers for student: [blue]{username}[/blue]")
+
+        async def rate(i: int) -> Optional[str]:
+            q_info = self._question_info(i)
+            if not q_info:
+                return None
+            try:
+                async with semaphore or nullcontext():
+                    correction = await self.arate_single_answer(
+                        q_info, student_row.get(f"answer_{i}", "")
+                    )
+                return self._correction_json(i, correction)
+            except Exception as e:
+                return self._error_json(i, username, e)
+
+        corrections = await asyncio.gather(*(rate(i) for i in range(num_questions)))
+        correction_row = {"username": username}
+        for i, correction in enumerate(corrections):
+            correction_row[f"answer_correction_{i}"] = correction
+        return correction_row
+
+    def _question_info(self, i: int) -> Optional[Dict[str, Any]]:
+        question_id = str(i + 1)
+        q_info = self.answers_data.get(question_id)
+        if not q_info:
+            rich.print(f"[yellow]Warning: No info for question {question_id}[/yellow]")
+        return q_info
+
+    @staticmethod
+    def _correction_json(i: int, correction: AnswerCorrection) -> str:
+        rich.print(f"Answer_{i}: {correction.model_dump()}")
+        return json.dumps(correction.model_dump())
+
+    @staticmethod
+    def _error_json(i: int, username: str, error: Exception) -> str:
+        rich.print(f"[red]Error rating answer_{i} for {username}: {error}[/red]")
+        return json.dumps(
+            {
+                "note": 0.0,
+                "justification": "Error during correction",
+                "commentaire": str(error),
+            }
+        )
+
+    def _invoke(self, runnable: Runnable, schema: Type[M], messages: List[BaseMessage]) -> M:
+        if self.cache and (cached := self.cache.get(self.model_name, schema, messages)):
+            return cached
+        if self.limiter is None:
+            result = runnable.invoke(messages)
+        else:
+            result = self.limiter.run_sync(lambda: runnable.invoke(messages), estimate_tokens(messages))
+        if self.cache:
+            self.cache.put(self.model_name, schema, messages, result)
+        return result
+
+    async def _ainvoke(self, runnable: Runnable, schema: Type[M], messages: List[BaseMessage]) -> M:
+        if self.cache and (cached := self.cache.get(self.model_name, schema, messages)):
+            return cached
+        if self.limiter is None:
+            result = await runnable.ainvoke(messages)
+        else:
+            result = await self.limiter.run(lambda: runnable.ainvoke(messages), estimate_tokens(messages))
+        if self.cache:
+            self.cache.put(self.model_name, schema, messages, result)
+        return result
+
     def rate_single_answer(self, question_info: Dict[str, Any], student_answer: str) -> AnswerCorrection:
+        return self._invoke(self.structured_llm, AnswerCorrection, self._answer_messages(question_info, student_answer))
+
+    async def arate_single_answer(self, question_info: Dict[str, Any], student_answer: str) -> AnswerCorrection:
+        return await self._ainvoke(self.structured_llm, AnswerCorrection, self._answer_messages(question_info, student_answer))
+
+    def _answer_messages(self, question_info: Dict[str, Any], student_answer: str) -> List[BaseMessage]:
         # Prepare prompts
         prompt_content = self.user_prompt_template.replace(
             "{{student_answer}}", "{student_answer}"
@@ -84,21 +173,25 @@ class AnswerRater:
             student_answer=student_answer,
         )
 
-        messages = [
+        return [
             SystemMessage(content=self.system_prompt),
             HumanMessage(content=user_message_content),
         ]
 
-        return self.structured_llm.invoke(messages)
-
     def rate_terraform(self, student_code: str, criterias: List[Dict[str, Any]]) -> TerraformRating:
+        return self._invoke(self.terraform_structured_llm, TerraformRating, self._terraform_messages(student_code, criterias))
+
+    async def arate_terraform(self, student_code: str, criterias: List[Dict[str, Any]]) -> TerraformRating:
+        return await self._ainvoke(
+            self.terraform_structured_llm, TerraformRating, self._terraform_messages(student_code, criterias)
+        )
+
+    def _terraform_messages(self, student_code: str, criterias: List[Dict[str, Any]]) -> List[BaseMessage]:
         user_message_content = self.terraform_user_prompt_template.replace(
             "{{criterias}}", json.dumps(criterias, indent=2, ensure_ascii=False)
         ).replace("{{student_code}}", student_code)
 
-        messages = [
+        return [
             SystemMessage(content=self.terraform_system_prompt),
             HumanMessage(content=user_message_content),
         ]
-
-        return self.terraform_structured_llm.invoke(messages)
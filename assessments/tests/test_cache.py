@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from assessments.app import rate_all_answers
+from assessments.cache import CorrectionCache
+from assessments.models import AnswerCorrection
+from assessments.rating import AnswerRater
+from test_rating import FakeLLM, student
+
+CORRECTION = AnswerCorrection(note=1.5, justification="ok", commentaire="")
+
+
+def messages(answer):
+    return [SystemMessage(content="system"), HumanMessage(content=answer)]
+
+
+def test_cache_hits_only_identical_inputs(tmp_path):
+    cache = CorrectionCache(tmp_path / "cache.sqlite")
+    cache.put("model-a", AnswerCorrection, messages("answer"), CORRECTION)
+
+    assert cache.get("model-a", AnswerCorrection, messages("answer")) == CORRECTION
+    assert cache.get("model-b", AnswerCorrection, messages("answer")) is None
+    assert cache.get("model-a", AnswerCorrection, messages("other answer")) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_persists_and_evicts(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = CorrectionCache(path)
+    for i in range(3):
+        cache.put("model", AnswerCorrection, messages(str(i)), CORRECTION)
+        time.sleep(0.01)
+    cache.get("model", AnswerCorrection, messages("0"))
+    cache.close()
+
+    cache = CorrectionCache(path, max_entries=2)
+    assert cache.get("model", AnswerCorrection, messages("0")) == CORRECTION
+    assert cache.get("model", AnswerCorrection, messages("1")) is None
+    assert cache.get("model", AnswerCorrection, messages("2")) == CORRECTION
+    cache.close()
+
+    cache = CorrectionCache(path, max_age_days=0)
+    assert cache.get("model", AnswerCorrection, messages("2")) is None
+
+
+def test_rerun_is_served_from_cache(tmp_path):
+    rows = [student(n) for n in range(2)]
+    llm = FakeLLM()
+    rater = AnswerRater(llm=llm, cache=CorrectionCache(tmp_path / "cache.sqlite"))
+    first = asyncio.run(rate_all_answers(rater, rows, concurrency=4))
+
+    llm.max_in_flight = 0
+    second = asyncio.run(rate_all_answers(rater, rows, concurrency=4))
+
+    assert second == first
+    assert llm.max_in_flight == 0
+    assert rater.cache.hits == rater.cache.misses
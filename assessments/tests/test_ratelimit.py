@@ -0,0 +1,83 @@
+import asyncio
+
+import httpx
+import pytest
+from assessments import ratelimit
+from assessments.ratelimit import ProviderLimits, RateLimiter, TokenBucket, is_throttling_error
+
+LIMITS = ProviderLimits(requests_per_minute=60_000, tokens_per_minute=60_000_000)
+
+
+def throttled():
+    request = httpx.Request("POST", "https://api.example.com")
+    return httpx.HTTPStatusError("Too many requests", request=request, response=httpx.Response(429, request=request))
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(ratelimit, "BACKOFF_BASE", 0.001)
+
+
+def test_throttled_calls_are_retried_and_halve_concurrency():
+    limiter = RateLimiter(LIMITS, max_concurrency=8)
+    failures = [throttled(), throttled()]
+
+    async def call():
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    assert asyncio.run(limiter.run(call, tokens=10)) == "ok"
+    assert limiter.throttled == 2
+    assert limiter.retries == 2
+    assert 2 <= limiter.concurrency < 3
+
+
+def test_other_errors_are_not_retried():
+    limiter = RateLimiter(LIMITS, max_concurrency=2)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise ValueError("invalid output")
+
+    with pytest.raises(ValueError):
+        limiter.run_sync(call, tokens=10)
+    assert len(calls) == 1
+    assert limiter.concurrency == 2
+
+
+def test_retries_are_bounded():
+    limiter = RateLimiter(LIMITS, max_retries=2)
+
+    async def call():
+        raise throttled()
+
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        asyncio.run(limiter.run(call, tokens=10))
+    assert is_throttling_error(error.value)
+    assert limiter.retries == 2
+
+
+def test_token_bucket_waits_once_empty():
+    bucket = TokenBucket(capacity=2, rate=10)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve(1) == pytest.approx(0.2, abs=0.01)
+
+
+def test_throttling_is_found_in_wrapped_errors():
+    class ProviderError(Exception):
+        def __init__(self, code):
+            super().__init__(f"error {code}")
+            self.code = code
+
+    try:
+        try:
+            raise ProviderError(429)
+        except ProviderError as e:
+            raise RuntimeError("Error calling model") from e
+    except RuntimeError as e:
+        assert is_throttling_error(e)
+    assert not is_throttling_error(ProviderError(400))
@@ -0,0 +1,47 @@
+import asyncio
+import json
+import random
+
+from langchain_core.runnables import RunnableLambda
+from assessments.app import rate_all_answers
+from assessments.models import AnswerCorrection
+from assessments.rating import AnswerRater
+
+
+class FakeLLM:
+    """Answers every question with a note read from the student answer, after a random delay."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def with_structured_output(self, schema):
+        async def respond(messages):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(random.random() / 100)
+            self.in_flight -= 1
+            note = float(messages[-1].content.rsplit("note=", 1)[-1].split()[0])
+            return AnswerCorrection(note=note, justification="", commentaire="")
+
+        return RunnableLambda(lambda messages: None, afunc=respond)
+
+
+def student(n):
+    return {"username": f"student{n}"} | {f"answer_{i}": f"note={n}.{i} " for i in range(14)}
+
+
+def test_rate_all_answers_keeps_order_and_bounds_concurrency():
+    llm = FakeLLM()
+    rater = AnswerRater(llm=llm)
+    rows = [student(n) for n in range(5)]
+
+    results = asyncio.run(rate_all_answers(rater, rows, concurrency=4))
+
+    assert [row["username"] for row in results] == [f"student{n}" for n in range(5)]
+    for n, row in enumerate(results):
+        assert list(row)[1:] == [f"answer_correction_{i}" for i in range(14)]
+        for i in range(14):
+            if row[f"answer_correction_{i}"] is not None:
+                assert json.loads(row[f"answer_correction_{i}"])["note"] == float(f"{n}.{i}")
+    assert 1 < llm.max_in_flight <= 4
@@ -0,0 +1,232 @@
+"""
+Read-query benchmark of a seeded school database.
+Replays a weighted mix of representative read queries from concurrent
+clients over a pooled AsyncEngine and reports latency percentiles and
+throughput per query.
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from search import has_search_index, search_sql
+
+# name -> (SQL, kind of parameter it needs). The SQL of name_search depends
+# on the dialect and on whether the search index exists, see search_sql.
+BENCH_QUERIES = {
+    "student_by_email": (
+        """
+        SELECT id, student_id, first_name, last_name, class_id, gpa
+        FROM students
+        WHERE email = :email
+        """,
+        "email",
+    ),
+    "transcript": (
+        """
+        SELECT c.course_name, c.credits, e.enrollment_date, e.grade, e.status
+        FROM enrollments e
+        JOIN courses c ON c.id = e.course_id
+        WHERE e.student_id = :student_id
+        ORDER BY e.enrollment_date
+        """,
+        "student_id",
+    ),
+    "class_roster": (
+        """
+        SELECT id, student_id, first_name, last_name, email
+        FROM students
+        WHERE class_id = :class_id
+        ORDER BY last_name, first_name
+        LIMIT 100
+        """,
+        "class_id",
+    ),
+    "name_search": (None, "term"),
+    "course_popularity": (
+        """
+        SELECT c.course_name, COUNT(*) AS enrollment_count
+        FROM enrollments e
+        JOIN courses c ON c.id = e.course_id
+        GROUP BY c.id, c.course_name
+        ORDER BY enrollment_count DESC
+        LIMIT 10
+        """,
+        None,
+    ),
+    "gpa_per_class": (
+        """
+        SELECT class_id, AVG(gpa), COUNT(*)
+        FROM students
+        GROUP BY class_id
+        """,
+        None,
+    ),
+}
+
+# Point lookups dominate, as they would for an application; the two full
+# scans are there to show how they compete with them
+DEFAULT_MIX = {
+    "student_by_email": 35,
+    "transcript": 35,
+    "class_roster": 15,
+    "name_search": 10,
+    "course_popularity": 3,
+    "gpa_per_class": 2,
+}
+
+# Students whose email, id and last name are used as lookup parameters
+PARAMETER_SAMPLE_SIZE = 1000
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse a "name=weight,name=weight" query mix."""
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in BENCH_QUERIES:
+            raise ValueError(
+                f"Unknown query {name!r} (available: {', '.join(BENCH_QUERIES)})"
+            )
+        try:
+            mix[name] = int(weight) if weight else 1
+        except ValueError:
+            raise ValueError(f"Invalid weight {weight!r} for query {name!r}") from None
+        if mix[name] < 0:
+            raise ValueError(f"Invalid weight {weight!r} for query {name!r}")
+    if not any(mix.values()):
+        raise ValueError("The query mix needs at least one positive weight")
+    return mix
+
+
+@dataclass
+class QueryResult:
+    name: str
+    count: int
+    qps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass
+class BenchResult:
+    dialect: str
+    duration: float
+    concurrency: int
+    queries: List[QueryResult]
+
+    @property
+    def total_qps(self) -> float:
+        return sum(query.count for query in self.queries) / self.duration
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "total_qps": self.total_qps}, indent=2)
+
+
+async def sample_parameters(engine: AsyncEngine, rng: random.Random) -> Dict[str, list]:
+    """Pick the emails, student ids, last names and class ids the parameterized queries look up."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM students"))
+        max_id = result.scalar_one()
+        ids = [rng.randint(1, max_id) for _ in range(PARAMETER_SAMPLE_SIZE)] if max_id else []
+        result = await conn.execute(
+            text(
+                f"SELECT id, email, last_name FROM students "
+                f"WHERE id IN ({', '.join(map(str, ids))})"
+            )
+            if ids
+            else text("SELECT id, email, last_name FROM students WHERE 1 = 0")
+        )
+        students = result.all()
+        result = await conn.execute(text("SELECT id FROM classes"))
+        class_ids = result.scalars().all()
+
+    if not students or not class_ids:
+        raise ValueError("The database has no students to benchmark")
+    return {
+        "email": [email for _, email, _ in students],
+        "student_id": [student_id for student_id, _, _ in students],
+        "term": [last_name for _, _, last_name in students],
+        "class_id": class_ids,
+    }
+
+
+async def run_benchmark(
+    engine: AsyncEngine,
+    dialect: str,
+    mix: Dict[str, int],
+    duration: float,
+    concurrency: int,
+    seed: Optional[int] = None,
+) -> BenchResult:
+    """Run the query mix from `concurrency` clients for `duration` seconds."""
+    rng = random.Random(seed)
+    parameters = await sample_parameters(engine, rng)
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    sql = {name: BENCH_QUERIES[name][0] for name in names}
+    if "name_search" in sql:
+        is_pg = engine.dialect.name == "postgresql"
+        sql["name_search"] = search_sql(is_pg, await has_search_index(engine, is_pg))
+    statements = {name: text(query) for name, query in sql.items()}
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+
+    async def client(client_rng: random.Random, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            name = client_rng.choices(names, weights)[0]
+            kind = BENCH_QUERIES[name][1]
+            params = {kind: client_rng.choice(parameters[kind])} if kind else {}
+            started = time.perf_counter()
+            async with engine.connect() as conn:
+                result = await conn.execute(statements[name], params)
+                result.all()
+            latencies[name].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(client(random.Random(rng.random()), deadline) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - started
+
+    queries = []
+    for name in names:
+        samples = np.array(latencies[name]) * 1000
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if len(samples) else (0, 0, 0)
+        queries.append(
+            QueryResult(
+                name=name,
+                count=len(samples),
+                qps=round(len(samples) / elapsed, 1),
+                p50_ms=round(float(p50), 3),
+                p95_ms=round(float(p95), 3),
+                p99_ms=round(float(p99), 3),
+            )
+        )
+    return BenchResult(dialect, round(elapsed, 3), concurrency, queries)
+
+
+def print_benchmark(result: BenchResult) -> None:
+    """Print the latency and throughput table of a benchmark run."""
+    print("\n" + "=" * 72)
+    print(
+        f"READ BENCHMARK ({result.dialect}, {result.concurrency} clients, {result.duration:.1f}s)"
+    )
+    print("=" * 72)
+    print(f"{'query':<20} {'count':>8} {'qps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for query in result.queries:
+        print(
+            f"{query.name:<20} {query.count:>8} {query.qps:>9.1f} "
+            f"{query.p50_ms:>9.2f} {query.p95_ms:>9.2f} {query.p99_ms:>9.2f}"
+        )
+    print(f"{'total':<20} {sum(q.count for q in result.queries):>8} {result.total_qps:>9.1f}")
+    print("=" * 72)
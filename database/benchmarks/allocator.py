@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the student code / email allocator.
+Allocates up to 10M student codes in fixed-size chunks and prints the cost
+per row of each decade, which should stay flat as the number of students grows.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import StudentCodeAllocator  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the student code allocator")
+    parser.add_argument(
+        "--students",
+        type=int,
+        default=10_000_000,
+        metavar="N",
+        help="Total number of students to allocate (default: 10000000)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        metavar="N",
+        help="Number of codes allocated per call (default: 100000)",
+    )
+    args = parser.parse_args()
+
+    allocator = StudentCodeAllocator()
+    checkpoint = 10_000
+    window_started = time.perf_counter()
+    window_rows = 0
+    # Codes are checked for uniqueness on a sample, keeping memory constant
+    sample = []
+
+    print(f"{'students':>12}  {'ns/row':>8}")
+    while allocator.next < args.students:
+        count = min(args.chunk_size, args.students - allocator.next)
+        counters = allocator.allocate(count)
+        codes = allocator.codes(counters)
+        sample.append(codes[0])
+        window_rows += count
+
+        if allocator.next >= checkpoint or allocator.next == args.students:
+            elapsed = time.perf_counter() - window_started
+            print(f"{allocator.next:>12,}  {elapsed / window_rows * 1e9:>8.0f}")
+            while checkpoint <= allocator.next:
+                checkpoint *= 10
+            window_started = time.perf_counter()
+            window_rows = 0
+
+    all_codes = StudentCodeAllocator.codes(np.arange(min(args.students, 1_000_000)))
+    assert len(set(all_codes)) == len(all_codes), "duplicate student codes"
+    assert len(set(sample)) == len(sample), "duplicate student codes"
+    print("✓ No duplicate codes")
+
+
+if __name__ == "__main__":
+    main()
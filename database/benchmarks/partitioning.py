@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark of partitioned enrollments on PostgreSQL.
+Loads the same seeded dataset into a flat enrollments table and into every
+partitioned layout, one after the other in the given database, and prints
+the load time and the median latency of per-course, per-month and
+per-student queries of each layout.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import (  # noqa: E402
+    DEFAULT_WRITERS,
+    ENROLLMENT_WINDOW_DAYS,
+    PARTITION_SCHEMES,
+    SEEDED_REFERENCE_DATE,
+    build_deferred_constraints,
+    create_database,
+    engine_options,
+    insert_generated_data,
+    is_postgres,
+    normalize_connection_string,
+)
+
+QUERIES = {
+    "per_course": """
+        SELECT status, COUNT(*)
+        FROM enrollments
+        WHERE course_id = :course_id
+        GROUP BY status
+    """,
+    "per_month": """
+        SELECT course_id, COUNT(*)
+        FROM enrollments
+        WHERE enrollment_date >= :start AND enrollment_date < :end
+        GROUP BY course_id
+    """,
+    "transcript": """
+        SELECT course_id, enrollment_date, grade, status
+        FROM enrollments
+        WHERE student_id = :student_id
+    """,
+}
+
+
+def month_bounds(rng: random.Random) -> dict:
+    """Return the first day of a random month of the enrollment window and of the next one."""
+    day = SEEDED_REFERENCE_DATE.toordinal() - rng.randrange(ENROLLMENT_WINDOW_DAYS)
+    start = date.fromordinal(day).replace(day=1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return {"start": start, "end": end}
+
+
+async def run_layout(connection_string: str, layout, args) -> tuple:
+    """Seed the database with `layout` and return (load seconds, {query: median ms})."""
+    engine = create_async_engine(
+        connection_string, echo=False, **engine_options(True, "durable", args.writers)
+    )
+    try:
+        await create_database(
+            engine, True, fast_load=True, partitioning=layout, today=SEEDED_REFERENCE_DATE
+        )
+        started = time.perf_counter()
+        await insert_generated_data(
+            engine,
+            args.students_per_class,
+            True,
+            args.seed,
+            SEEDED_REFERENCE_DATE,
+            use_copy=True,
+            writers=args.writers,
+        )
+        await build_deferred_constraints(engine, True, layout)
+        load_time = time.perf_counter() - started
+
+        async with engine.connect() as conn:
+            await conn.execute(text("ANALYZE"))
+            result = await conn.execute(text("SELECT MAX(id) FROM students"))
+            students = result.scalar_one()
+            result = await conn.execute(text("SELECT MAX(id) FROM courses"))
+            courses = result.scalar_one()
+
+            rng = random.Random(args.seed)
+            parameters = {
+                "per_course": lambda: {"course_id": rng.randint(1, courses)},
+                "per_month": lambda: month_bounds(rng),
+                "transcript": lambda: {"student_id": rng.randint(1, students)},
+            }
+            timings = {}
+            for name, query in QUERIES.items():
+                statement = text(query)
+                samples = []
+                for _ in range(args.runs):
+                    params = parameters[name]()
+                    query_started = time.perf_counter()
+                    result = await conn.execute(statement, params)
+                    result.all()
+                    samples.append((time.perf_counter() - query_started) * 1000)
+                timings[name] = statistics.median(samples)
+        return load_time, timings
+    finally:
+        await engine.dispose()
+
+
+async def run(args) -> None:
+    connection_string = normalize_connection_string(args.database)
+    results = {}
+    for layout in (None, *PARTITION_SCHEMES):
+        results[layout or "flat"] = await run_layout(connection_string, layout, args)
+
+    print(f"\n{'layout':<8} {'load s':>8}" + "".join(f" {name + ' ms':>15}" for name in QUERIES))
+    for layout, (load_time, timings) in results.items():
+        print(
+            f"{layout:<8} {load_time:>8.2f}"
+            + "".join(f" {timings[name]:>15.2f}" for name in QUERIES)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark flat vs partitioned enrollments on PostgreSQL (drops the tables of DATABASE)"
+    )
+    parser.add_argument("database", help="PostgreSQL connection string of a scratch database")
+    parser.add_argument(
+        "--students-per-class",
+        type=int,
+        default=50_000,
+        metavar="N",
+        help="Number of students per class (default: 50000)",
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=DEFAULT_WRITERS,
+        metavar="N",
+        help=f"Concurrent COPY writers (default: {DEFAULT_WRITERS})",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Runs of every query, with different parameters (default: 20)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Data seed (default: 42)")
+    args = parser.parse_args()
+
+    if not is_postgres(normalize_connection_string(args.database)):
+        parser.error("Partitioning is only available on PostgreSQL")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
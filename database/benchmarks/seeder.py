@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite of the seeder.
+Runs main.py against SQLite (file and in-memory) and, given a scratch
+database, PostgreSQL, at several scales and with every load strategy of the
+dialect. Rows/s per table, wall time and peak memory of each run are written
+to a JSON results file and compared against a stored baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import normalize_connection_string  # noqa: E402
+from stats import SUMMARY_TABLE  # noqa: E402
+from views import READ_VIEWS  # noqa: E402
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "seeder_baseline.json"
+
+TARGETS = ("sqlite-file", "sqlite-memory", "postgres")
+# Load strategies per dialect, as main.py arguments
+STRATEGIES = {
+    "sqlite": {
+        "batched": ["--batch-size", "5000"],
+        "streamed": ["--batch-size", "5000", "--stream"],
+        "pipelined": ["--batch-size", "5000", "--writers", "1", "--workers", "2"],
+        "server-side": ["--batch-size", "5000", "--server-side-enrollments"],
+        "fast": ["--batch-size", "5000", "--fast-load", "--load-profile", "fast"],
+    },
+    "postgres": {
+        "batched": ["--batch-size", "5000"],
+        "copy": ["--copy"],
+        "pipelined": ["--copy", "--writers", "4", "--workers", "2"],
+        "server-side": ["--copy", "--server-side-enrollments"],
+        "fast": ["--copy", "--writers", "4", "--fast-load", "--load-profile", "fast"],
+    },
+}
+# The fast profile reopens its connections, which discards an in-memory database
+SKIPPED = {("sqlite-memory", "fast")}
+DEFAULT_SCALES = "1000,10000"
+# Relative slowdown of the wall time reported as a regression
+DEFAULT_TOLERANCE = 0.10
+
+# Lines printed by main.report_rate and at the end of a load
+RATE_LINE = re.compile(r"^  ([\w ()]+): \d+ rows in [\d.]+s \(([\d,]+) rows/s\)", re.MULTILINE)
+PEAK_RSS_LINE = re.compile(r"Peak RSS: ([\d.]+) MiB(?: \(worker processes: ([\d.]+) MiB\))?")
+
+
+async def drop_tables(connection_string: str) -> None:
+    """Drop the schema of a PostgreSQL scratch database, so main.py seeds it again."""
+    engine = create_async_engine(connection_string)
+    try:
+        async with engine.begin() as conn:
+            for view_name in READ_VIEWS:
+                await conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}"))
+            for table_name in (SUMMARY_TABLE, "enrollments", "students", "courses", "classes"):
+                await conn.execute(text(f"DROP TABLE IF EXISTS {table_name} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+def run_case(database: str, arguments: List[str], scale: int, seed: int) -> Dict:
+    """Seed `database` once and return the measurements of the run."""
+    command = [
+        sys.executable,
+        str(MAIN),
+        database,
+        "--students-per-class",
+        str(scale),
+        "--seed",
+        str(seed),
+        *arguments,
+    ]
+    started = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if completed.returncode != 0 or "✗ Error" in completed.stdout:
+        raise RuntimeError(
+            f"{' '.join(command)} failed:\n{completed.stdout[-2000:]}{completed.stderr[-2000:]}"
+        )
+
+    tables = {
+        label: int(rate.replace(",", "")) for label, rate in RATE_LINE.findall(completed.stdout)
+    }
+    peak = PEAK_RSS_LINE.search(completed.stdout)
+    return {
+        "wall_s": round(wall, 3),
+        "peak_rss_mib": float(peak.group(1)) if peak else None,
+        "workers_rss_mib": float(peak.group(2)) if peak and peak.group(2) else None,
+        "rows_per_s": tables,
+    }
+
+
+def run_suite(args) -> Dict[str, Dict]:
+    """Run every selected (target, strategy, scale) case and return the results by case name."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="seeder-bench-") as tmp:
+        for target in args.targets:
+            dialect = "postgres" if target == "postgres" else "sqlite"
+            for strategy, arguments in STRATEGIES[dialect].items():
+                if (target, strategy) in SKIPPED:
+                    continue
+                if args.strategies and strategy not in args.strategies:
+                    continue
+                for scale in args.scales:
+                    name = f"{target}/{strategy}/{scale}"
+                    if target == "sqlite-file":
+                        database = str(Path(tmp) / f"{strategy}-{scale}.db")
+                    elif target == "sqlite-memory":
+                        database = "sqlite+aiosqlite:///:memory:"
+                    else:
+                        database = args.postgres
+                        asyncio.run(drop_tables(normalize_connection_string(database)))
+                    print(f"{name}...", end=" ", flush=True)
+                    results[name] = run_case(database, arguments, scale, args.seed)
+                    print(f"{results[name]['wall_s']:.2f}s")
+                    if target == "sqlite-file":
+                        Path(database).unlink()
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print the wall time of every case next to its baseline and return the regressions."""
+    regressions = []
+    print(f"\n{'case':<36} {'wall s':>8} {'baseline':>9} {'change':>8} {'peak MiB':>9}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        peak = result["peak_rss_mib"]
+        peak_column = f"{peak:>9.1f}" if peak is not None else f"{'-':>9}"
+        if previous is None:
+            print(f"{name:<36} {result['wall_s']:>8.2f} {'-':>9} {'-':>8} {peak_column}")
+            continue
+        change = result["wall_s"] / previous["wall_s"] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  slower"
+        print(
+            f"{name:<36} {result['wall_s']:>8.2f} {previous['wall_s']:>9.2f} "
+            f"{change:>+8.1%} {peak_column}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the seeder across dialects, sizes and load strategies")
+    parser.add_argument(
+        "--targets",
+        type=lambda value: value.split(","),
+        default=["sqlite-file", "sqlite-memory"],
+        help=f"Comma-separated targets among {', '.join(TARGETS)} (default: sqlite-file,sqlite-memory, plus postgres with --postgres)",
+    )
+    parser.add_argument(
+        "--postgres",
+        type=str,
+        default=None,
+        metavar="URL",
+        help="Scratch PostgreSQL database (its tables are dropped before every run)",
+    )
+    parser.add_argument(
+        "--strategies",
+        type=lambda value: value.split(","),
+        default=None,
+        help="Comma-separated load strategies to run (default: all of each dialect)",
+    )
+    parser.add_argument(
+        "--scales",
+        type=lambda value: [int(scale) for scale in value.split(",")],
+        default=DEFAULT_SCALES,
+        help=f"Comma-separated students per class (default: {DEFAULT_SCALES})",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Data seed (default: 42)")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="seeder_results.json",
+        metavar="FILE",
+        help="Results file (default: seeder_results.json)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=str(DEFAULT_BASELINE),
+        metavar="FILE",
+        help="Baseline results to compare against (default: benchmarks/seeder_baseline.json)",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as the new baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Wall time increase reported as a regression (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args()
+
+    if args.postgres and "postgres" not in args.targets:
+        args.targets.append("postgres")
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        parser.error(f"Unknown target(s) {', '.join(unknown)} (available: {', '.join(TARGETS)})")
+    if "postgres" in args.targets and not args.postgres:
+        parser.error("The postgres target needs --postgres")
+    known = {strategy for strategies in STRATEGIES.values() for strategy in strategies}
+    unknown = [strategy for strategy in args.strategies or [] if strategy not in known]
+    if unknown:
+        parser.error(f"Unknown strategies {', '.join(unknown)} (available: {', '.join(sorted(known))})")
+
+    results = run_suite(args)
+    document = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(document, indent=2) + "\n")
+    print(f"\n✓ Results written to {args.output}")
+
+    baseline_path = Path(args.baseline)
+    baseline: Optional[Dict] = None
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = compare(results, baseline or {}, args.tolerance)
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"✓ Baseline updated: {baseline_path}")
+    elif baseline is None:
+        print(f"No baseline at {baseline_path}, store one with --update-baseline")
+    if regressions and not args.update_baseline:
+        print(f"\n✗ {len(regressions)} case(s) more than {args.tolerance:.0%} slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Driver-level access to a SQLAlchemy connection, for bulk loads (asyncpg COPY,
+positional executemany) that SQLAlchemy's execute() does not expose.
+"""
+
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def driver_connection(conn: AsyncConnection) -> Any:
+    """Return the driver connection of `conn`, inside its open transaction.
+
+    SQLAlchemy's asyncpg adapter only begins the transaction of an
+    engine.begin() block with its first statement, so a COPY run on the
+    driver before any statement would commit on its own. The transaction is
+    started here instead, and the driver's work commits or rolls back with
+    `conn`; a RuntimeError is raised if asyncpg does not report it open.
+    sqlite3 begins its transaction with the first INSERT by itself.
+    """
+    if not conn.in_transaction():
+        raise RuntimeError("driver_connection needs a connection inside a transaction")
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    if conn.dialect.driver != "asyncpg" or driver.is_in_transaction():
+        return driver
+
+    start = getattr(raw.dbapi_connection, "_start_transaction", None)
+    if start is not None:
+        await start()
+    if not driver.is_in_transaction():
+        raise RuntimeError(
+            "Cannot begin SQLAlchemy's transaction on the asyncpg connection, "
+            "a COPY would not roll back with it"
+        )
+    return driver
@@ -0,0 +1,128 @@
+"""
+Phase-level profiling of a database load.
+A Profiler records one span per phase (wall time, CPU time of the event
+loop thread, rows) and can wrap the whole run in cProfile or tracemalloc.
+Time a span spends off the event loop thread is spent waiting for the
+database (or for worker processes), so Python and database time are told
+apart without instrumenting every driver call.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+# Functions (cProfile) or allocation sites (tracemalloc) listed in a report
+REPORT_TOP = 25
+
+
+@dataclass
+class Span:
+    name: str
+    wall: float = 0.0
+    python: float = 0.0
+    rows: Optional[int] = None
+    # Peak traced memory during the span, with tracemalloc
+    peak_mib: Optional[float] = None
+    # (rows, seconds) per table of a load, as reported by its LoadReport
+    tables: Dict[str, Tuple[int, float]] = field(default_factory=dict)
+
+    @property
+    def waiting(self) -> float:
+        return max(self.wall - self.python, 0.0)
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        return self.rows / self.wall if self.rows is not None and self.wall > 0 else None
+
+
+class Profiler:
+    """Records the spans of a run, optionally under cProfile or tracemalloc."""
+
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode
+        self.spans: List[Span] = []
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self) -> None:
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.mode == "tracemalloc":
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self._cprofile:
+            self._cprofile.disable()
+        elif self.mode == "tracemalloc" and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    @contextmanager
+    def span(self, name: str, rows: Optional[int] = None) -> Iterator[Span]:
+        """Time the enclosed phase; its rows may be set on the yielded Span."""
+        span = Span(name, rows=rows)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        wall_started, python_started = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            span.wall = time.perf_counter() - wall_started
+            span.python = time.thread_time() - python_started
+            if tracing:
+                span.peak_mib = tracemalloc.get_traced_memory()[1] / 2**20
+            self.spans.append(span)
+
+    def report(self) -> str:
+        """Return the span table, followed by the cProfile or tracemalloc top entries."""
+        lines = [
+            f"{'phase':<32} {'wall s':>8} {'python s':>9} {'db/wait s':>10} "
+            f"{'rows':>10} {'rows/s':>10}"
+            + (f" {'peak MiB':>9}" if self.mode == "tracemalloc" else "")
+        ]
+        for span in self.spans:
+            rows = f"{span.rows:>10}" if span.rows is not None else f"{'':>10}"
+            rate = f"{span.rows_per_s:>10,.0f}" if span.rows_per_s is not None else f"{'':>10}"
+            peak = f" {span.peak_mib:>9.1f}" if span.peak_mib is not None else ""
+            lines.append(
+                f"{span.name:<32} {span.wall:>8.2f} {span.python:>9.2f} "
+                f"{span.waiting:>10.2f} {rows} {rate}{peak}"
+            )
+            for table_name, (table_rows, seconds) in span.tables.items():
+                lines.append(
+                    f"  {table_name:<30} {seconds:>8.2f} {'':>9} {'':>10} "
+                    f"{table_rows:>10} {table_rows / max(seconds, 1e-9):>10,.0f}"
+                )
+
+        if self._cprofile:
+            out = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=out)
+            stats.sort_stats("cumulative").print_stats(REPORT_TOP)
+            lines += ["", "cProfile (cumulative time)", out.getvalue().strip()]
+        if self._snapshot:
+            lines += ["", "tracemalloc (live allocations at the end of the run)"]
+            for stat in self._snapshot.statistics("lineno")[:REPORT_TOP]:
+                lines.append(str(stat))
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write the report to `path`, the spans to `path`.json and raw cProfile data to `path`.prof."""
+        with open(path, "w") as f:
+            f.write(self.report() + "\n")
+        spans = [
+            {**asdict(span), "waiting": span.waiting, "rows_per_s": span.rows_per_s}
+            for span in self.spans
+        ]
+        with open(f"{path}.json", "w") as f:
+            f.write(json.dumps({"mode": self.mode, "spans": spans}, indent=2) + "\n")
+        if self._cprofile:
+            self._cprofile.dump_stats(f"{path}.prof")
@@ -0,0 +1,175 @@
+"""
+Fast reset of a seeded database from a golden copy.
+PostgreSQL clones the golden database with CREATE DATABASE ... TEMPLATE,
+SQLite copies the golden file, so no row is generated or inserted again.
+"""
+
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+# CREATE DATABASE ... STRATEGY appeared in PostgreSQL 15; FILE_COPY copies
+# the template's files instead of WAL-logging every block
+FILE_COPY_MIN_VERSION = 150000
+
+# Suffix of the database the golden copy is cloned into before replacing the target
+RESET_SUFFIX = "_reset"
+# PostgreSQL truncates identifiers to 63 bytes
+MAX_IDENTIFIER_LENGTH = 63
+
+# Database privileges by their aclitem letter
+DATABASE_PRIVILEGES = {"C": "CREATE", "c": "CONNECT", "T": "TEMPORARY"}
+
+
+def golden_name(golden: str) -> str:
+    """Return the database name of `golden`, given as a name or a connection string."""
+    return make_url(golden).database if "://" in golden else golden
+
+
+def grant_statements(database: str, acl: Optional[List[str]], quote: Callable[[str], str]) -> List[str]:
+    """Return the statements giving a new `database` the privileges of `acl`.
+
+    `acl` holds the aclitems ("grantee=privileges/grantor", an empty grantee
+    being PUBLIC) of the database it replaces; None means default privileges,
+    which a new database already has.
+    """
+    if acl is None:
+        return []
+    statements = [f"REVOKE ALL ON DATABASE {database} FROM PUBLIC"]
+    for item in acl:
+        grantee, privileges = item.rsplit("/", 1)[0].rsplit("=", 1)
+        if grantee.startswith('"'):
+            grantee = grantee[1:-1].replace('""', '"')
+        grantee = quote(grantee) if grantee else "PUBLIC"
+        # A "*" after a privilege letter marks it grantable
+        plain, grantable = [], []
+        for position, letter in enumerate(privileges):
+            if letter in DATABASE_PRIVILEGES:
+                with_option = privileges[position + 1 : position + 2] == "*"
+                (grantable if with_option else plain).append(DATABASE_PRIVILEGES[letter])
+        if plain:
+            statements.append(f"GRANT {', '.join(plain)} ON DATABASE {database} TO {grantee}")
+        if grantable:
+            statements.append(
+                f"GRANT {', '.join(grantable)} ON DATABASE {database} TO {grantee} WITH GRANT OPTION"
+            )
+    return statements
+
+
+async def reset_postgres(connection_string: str, golden: str) -> None:
+    """Drop the target database and recreate it from the `golden` template database.
+
+    Runs from the server's "postgres" maintenance database, since neither the
+    target nor the template may have open sessions. The golden copy is cloned
+    under a temporary name first and the target is only dropped once the
+    clone succeeded. The target keeps its owner and database-level grants.
+
+    The connecting role needs CREATEDB and must be a superuser, own the
+    golden database or find it marked as a template (ALTER DATABASE golden
+    IS_TEMPLATE true); it must also be a member of the target's owner role
+    unless it is a superuser.
+    """
+    url = make_url(connection_string)
+    target, template = url.database, golden_name(golden)
+    if target == template:
+        raise ValueError(f"Cannot reset {target!r} from itself")
+
+    engine = create_async_engine(
+        url.set(database="postgres"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    quote = engine.dialect.identifier_preparer.quote
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SHOW server_version_num"))
+            strategy = (
+                " STRATEGY FILE_COPY"
+                if int(result.scalar_one()) >= FILE_COPY_MIN_VERSION
+                else ""
+            )
+            # Checked first so that a bad template name does not cost the target
+            result = await conn.execute(
+                text(
+                    """
+                    SELECT datistemplate
+                        OR pg_has_role(datdba, 'MEMBER')
+                        OR (SELECT rolsuper FROM pg_roles WHERE rolname = current_user)
+                    FROM pg_database WHERE datname = :name
+                    """
+                ),
+                {"name": template},
+            )
+            cloneable = result.scalar_one_or_none()
+            if cloneable is None:
+                raise ValueError(f"Golden database {template!r} does not exist")
+            if not cloneable:
+                raise PermissionError(
+                    f"Cannot clone {template!r}: connect as a superuser or its owner, "
+                    f"or mark it as a template (ALTER DATABASE {quote(template)} IS_TEMPLATE true)"
+                )
+            result = await conn.execute(
+                text(
+                    "SELECT pg_get_userbyid(datdba), datacl::text[] FROM pg_database WHERE datname = :name"
+                ),
+                {"name": target},
+            )
+            owner, acl = result.first() or (None, None)
+
+            # The clone is built under a temporary name and only replaces the
+            # target once complete, so a failed clone leaves the target as it was
+            clone = target.encode()[: MAX_IDENTIFIER_LENGTH - len(RESET_SUFFIX)].decode(
+                errors="ignore"
+            ) + RESET_SUFFIX
+            if clone == template:
+                raise ValueError(f"Cannot reset {target!r} from {template!r}, its temporary clone name")
+            await conn.execute(text(f"DROP DATABASE IF EXISTS {quote(clone)} WITH (FORCE)"))
+            try:
+                await conn.execute(
+                    text(
+                        f"CREATE DATABASE {quote(clone)} TEMPLATE {quote(template)}{strategy}"
+                        + (f" OWNER {quote(owner)}" if owner else "")
+                    )
+                )
+                for statement in grant_statements(quote(clone), acl, quote):
+                    await conn.execute(text(statement))
+            except Exception:
+                await conn.execute(text(f"DROP DATABASE IF EXISTS {quote(clone)}"))
+                raise
+            await conn.execute(text(f"DROP DATABASE IF EXISTS {quote(target)} WITH (FORCE)"))
+            await conn.execute(text(f"ALTER DATABASE {quote(clone)} RENAME TO {quote(target)}"))
+    finally:
+        await engine.dispose()
+
+
+def reset_sqlite(path: str, golden: str) -> None:
+    """Replace the SQLite file at `path` by a copy of `golden`.
+
+    The copy is written next to the target and renamed over it, so readers
+    never see a partial file. A golden database with a pending write-ahead
+    log is copied with the online backup API, which includes the log.
+    """
+    target, source = Path(path), Path(golden)
+    if not source.exists():
+        raise FileNotFoundError(f"Golden database {golden} does not exist")
+    if target.resolve() == source.resolve():
+        raise ValueError(f"Cannot reset {path} from itself")
+
+    partial = target.with_name(target.name + ".reset")
+    if Path(f"{source}-wal").exists():
+        src, dst = sqlite3.connect(source), sqlite3.connect(partial)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    else:
+        shutil.copyfile(source, partial)
+
+    for suffix in ("-wal", "-shm", "-journal"):
+        Path(f"{target}{suffix}").unlink(missing_ok=True)
+    os.replace(partial, target)
@@ -0,0 +1,186 @@
+"""
+Substring search over student names and emails.
+SQLite gets an external-content FTS5 table with the trigram tokenizer,
+kept in sync with `students` by triggers; PostgreSQL gets pg_trgm GIN
+indexes. Both serve `LIKE '%term%'`-style lookups without a full scan.
+"""
+
+import random
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SEARCH_TABLE = "students_search"
+
+SQLITE_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        first_name, last_name, email,
+        content='students', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON students BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON students BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_update AFTER UPDATE ON students BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        INSERT INTO {SEARCH_TABLE} (rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END
+    """,
+]
+
+# Searched columns, each with a pg_trgm index on PostgreSQL
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+
+SEARCH_COLUMNS = "s.id, s.student_id, s.first_name, s.last_name, s.email, s.class_id"
+# Results returned by a search
+SEARCH_LIMIT = 20
+# Searches (with different terms) per kind of term when timing
+TIMING_RUNS = 10
+# Trigram indexes cannot serve shorter terms
+MIN_INDEXED_TERM = 3
+
+
+def _like_condition(operator: str) -> str:
+    return " OR ".join(f"s.{field} {operator} '%' || :term || '%'" for field in SEARCH_FIELDS)
+
+
+def search_sql(is_pg: bool, indexed: bool) -> str:
+    """Return the query finding students whose name or email contains `:term`.
+
+    The FTS5 query quotes the term as a phrase, which the trigram tokenizer
+    matches anywhere in a column like LIKE '%term%' does. Terms too short for
+    trigrams fall back to LIKE. PostgreSQL runs the same ILIKE with or without
+    its trigram indexes.
+    """
+    if is_pg:
+        return f"""
+            SELECT {SEARCH_COLUMNS}
+            FROM students s
+            WHERE {_like_condition("ILIKE")}
+            LIMIT {SEARCH_LIMIT}
+        """
+    if indexed:
+        return f"""
+            SELECT {SEARCH_COLUMNS}
+            FROM {SEARCH_TABLE}
+            JOIN students s ON s.id = {SEARCH_TABLE}.rowid
+            WHERE length(:term) >= {MIN_INDEXED_TERM}
+              AND {SEARCH_TABLE} MATCH '"' || replace(:term, '"', '""') || '"'
+            UNION ALL
+            SELECT {SEARCH_COLUMNS}
+            FROM students s
+            WHERE length(:term) < {MIN_INDEXED_TERM} AND ({_like_condition("LIKE")})
+            LIMIT {SEARCH_LIMIT}
+        """
+    return f"""
+        SELECT {SEARCH_COLUMNS}
+        FROM students s
+        WHERE {_like_condition("LIKE")}
+        LIMIT {SEARCH_LIMIT}
+    """
+
+
+def _trigram_index(field: str) -> str:
+    return f"idx_students_{field}_trgm"
+
+
+async def has_search_index(engine: AsyncEngine, is_pg: bool) -> bool:
+    """Return True if the search index has been built."""
+    async with engine.connect() as conn:
+        if is_pg:
+            names = await conn.run_sync(
+                lambda sync_conn: {
+                    index["name"] for index in inspect(sync_conn).get_indexes("students")
+                }
+            )
+            return all(_trigram_index(field) in names for field in SEARCH_FIELDS)
+        return await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).has_table(SEARCH_TABLE)
+        )
+
+
+async def build_search_index(engine: AsyncEngine, is_pg: bool) -> None:
+    """Build the search index over the students already loaded.
+
+    Meant to run after the bulk load: the FTS5 table is filled in one
+    'rebuild' pass and only then do its triggers track later changes.
+    """
+    async with engine.begin() as conn:
+        if is_pg:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for field in SEARCH_FIELDS:
+                await conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {_trigram_index(field)} ON students "
+                        f"USING gin ({field} gin_trgm_ops)"
+                    )
+                )
+            return
+
+        for trigger in ("insert", "delete", "update"):
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{trigger}"))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+        for statement in SQLITE_SEARCH_DDL:
+            await conn.execute(text(statement))
+        await conn.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+        )
+
+
+async def sample_search_terms(
+    engine: AsyncEngine, rng: random.Random, count: int
+) -> Dict[str, List[str]]:
+    """Return `count` last names and email fragments of random students.
+
+    Email fragments are the "lastname<n>" part of the address, which matches
+    few students, whereas a last name is shared by many.
+    """
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM students"))
+        max_id = result.scalar_one()
+        ids = [rng.randint(1, max_id) for _ in range(count)] if max_id else []
+        result = await conn.execute(
+            text(f"SELECT last_name, email FROM students WHERE id IN ({', '.join(map(str, ids))})")
+            if ids
+            else text("SELECT last_name, email FROM students WHERE 1 = 0")
+        )
+        students = result.all()
+    return {
+        "name": [last_name for last_name, _ in students],
+        "email": [email.split("@")[0].split(".")[-1] for _, email in students],
+    }
+
+
+async def time_search(
+    engine: AsyncEngine, is_pg: bool, indexed: bool, seed: Optional[int] = None
+) -> Dict[str, float]:
+    """Return the median latency in ms of name and email searches."""
+    terms = await sample_search_terms(engine, random.Random(seed), TIMING_RUNS)
+    statement = text(search_sql(is_pg, indexed))
+    timings = {}
+    async with engine.connect() as conn:
+        for kind, values in terms.items():
+            samples = []
+            for term in values:
+                started = time.perf_counter()
+                result = await conn.execute(statement, {"term": term})
+                result.all()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[f"{kind}_search"] = statistics.median(samples) if samples else 0.0
+    return timings
@@ -0,0 +1,253 @@
+"""
+Snapshots of a school database.
+A snapshot is a directory holding one CSV or Parquet file per table and a
+`snapshot.json` manifest. Loading one skips data generation entirely and
+uses the fastest bulk path of each dialect.
+"""
+
+import csv
+import json
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from driver import driver_connection
+
+SNAPSHOT_FORMATS = ("csv", "parquet")
+MANIFEST = "snapshot.json"
+
+# Exported columns and their kind, in load order (referenced tables first).
+# created_at is left out and filled by its default when loading.
+SNAPSHOT_TABLES = {
+    "classes": [
+        ("id", "int"),
+        ("class_code", "str"),
+        ("class_name", "str"),
+        ("start_date", "date"),
+    ],
+    "courses": [
+        ("id", "int"),
+        ("course_name", "str"),
+        ("description", "str"),
+        ("credits", "int"),
+    ],
+    "students": [
+        ("id", "int"),
+        ("student_id", "str"),
+        ("first_name", "str"),
+        ("last_name", "str"),
+        ("email", "str"),
+        ("date_of_birth", "date"),
+        ("class_id", "int"),
+        ("gpa", "gpa"),
+        ("enrollment_date", "date"),
+    ],
+    "enrollments": [
+        ("id", "int"),
+        ("student_id", "int"),
+        ("course_id", "int"),
+        ("enrollment_date", "date"),
+        ("grade", "str"),
+        ("status", "str"),
+    ],
+}
+
+
+def _import_pyarrow():
+    """Return (pyarrow, pyarrow.parquet), which only Parquet snapshots need."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet snapshots require pyarrow (pip install pyarrow)") from e
+    return pyarrow, pyarrow.parquet
+
+
+def _normalize(kind: str, value: Any) -> Any:
+    """Return `value` as the Python type of `kind`, whatever the driver returned."""
+    if value is None:
+        return None
+    if kind == "date" and isinstance(value, str):
+        return date.fromisoformat(value)
+    if kind == "gpa":
+        return Decimal(f"{value:.2f}")
+    return value
+
+
+def _arrow_schema(pa, table_name: str):
+    types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "date": pa.date32(),
+        "gpa": pa.decimal128(3, 2),
+    }
+    return pa.schema(
+        [(column, types[kind]) for column, kind in SNAPSHOT_TABLES[table_name]]
+    )
+
+
+async def export_snapshot(
+    engine: AsyncEngine, directory: str, fmt: str, chunk_size: int
+) -> Dict[str, Tuple[int, float]]:
+    """Write every table to `directory` and return (rows, seconds) per table.
+
+    Rows are streamed `chunk_size` at a time, so memory stays constant.
+    """
+    if fmt == "parquet":
+        pa, pq = _import_pyarrow()
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    timings = {}
+
+    async with engine.connect() as conn:
+        for table_name, columns in SNAPSHOT_TABLES.items():
+            started = time.perf_counter()
+            names = [column for column, _ in columns]
+            kinds = [kind for _, kind in columns]
+            result = await conn.stream(
+                text(f"SELECT {', '.join(names)} FROM {table_name} ORDER BY id")
+            )
+            rows = 0
+
+            if fmt == "csv":
+                with open(path / f"{table_name}.csv", "w", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(names)
+                    # Dates are written in ISO format whether the driver returns
+                    # them as dates or strings, so only GPAs need normalizing
+                    gpa_columns = [i for i, kind in enumerate(kinds) if kind == "gpa"]
+                    async for partition in result.partitions(chunk_size):
+                        if gpa_columns:
+                            partition = [list(row) for row in partition]
+                            for row in partition:
+                                for i in gpa_columns:
+                                    row[i] = _normalize("gpa", row[i])
+                        writer.writerows(partition)
+                        rows += len(partition)
+            else:
+                schema = _arrow_schema(pa, table_name)
+                with pq.ParquetWriter(path / f"{table_name}.parquet", schema) as writer:
+                    async for partition in result.partitions(chunk_size):
+                        arrays = [
+                            pa.array([_normalize(kind, value) for value in values], arrow_type)
+                            for kind, values, arrow_type in zip(
+                                kinds, zip(*partition), schema.types
+                            )
+                        ]
+                        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                        rows += len(partition)
+
+            timings[table_name] = (rows, time.perf_counter() - started)
+
+    manifest = {
+        "format": fmt,
+        "tables": {table_name: rows for table_name, (rows, _) in timings.items()},
+    }
+    (path / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    return timings
+
+
+def _csv_batches(path: Path, chunk_size: int) -> Iterator[List[List[Any]]]:
+    """Yield the rows of a snapshot CSV file, with empty fields read as NULL."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        batch = []
+        for row in reader:
+            batch.append([value if value != "" else None for value in row])
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _parquet_batches(path: Path, chunk_size: int) -> Iterator[List[tuple]]:
+    """Yield the rows of a snapshot Parquet file as tuples of Python values."""
+    _, pq = _import_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield list(zip(*(column.to_pylist() for column in batch.columns)))
+
+
+def _sqlite_value(value: Any) -> Any:
+    """Convert Parquet values to types the sqlite3 module binds natively."""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+async def load_snapshot(
+    engine: AsyncEngine, is_pg: bool, directory: str, chunk_size: int
+) -> Dict[str, Tuple[int, float]]:
+    """Load the snapshot in `directory` into empty tables and return (rows, seconds) per table.
+
+    PostgreSQL reads CSV files with COPY ... FROM STDIN and Parquet files with
+    binary COPY; SQLite uses executemany batches. Ids are kept as exported.
+    """
+    path = Path(directory)
+    manifest = json.loads((path / MANIFEST).read_text())
+    fmt = manifest["format"]
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r} in {path / MANIFEST}")
+    timings = {}
+
+    async with engine.begin() as conn:
+        for table_name, columns in SNAPSHOT_TABLES.items():
+            started = time.perf_counter()
+            names = [column for column, _ in columns]
+            table_file = path / f"{table_name}.{fmt}"
+            rows = 0
+
+            if is_pg:
+                raw = await driver_connection(conn)
+                if fmt == "csv":
+                    status = await raw.copy_to_table(
+                        table_name, source=table_file, columns=names, format="csv", header=True
+                    )
+                    rows = int(status.split()[-1])
+                else:
+                    for batch in _parquet_batches(table_file, chunk_size):
+                        await raw.copy_records_to_table(
+                            table_name, records=batch, columns=names
+                        )
+                        rows += len(batch)
+                await conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                        f"(SELECT MAX(id) FROM {table_name}))"
+                    )
+                )
+            else:
+                # Positional executemany on the driver connection skips building a
+                # parameter dict per row
+                insert = (
+                    f"INSERT INTO {table_name} ({', '.join(names)}) "
+                    f"VALUES ({', '.join('?' for _ in names)})"
+                )
+                raw = await driver_connection(conn)
+                if fmt == "csv":
+                    batches = _csv_batches(table_file, chunk_size)
+                else:
+                    batches = (
+                        [[_sqlite_value(value) for value in row] for row in batch]
+                        for batch in _parquet_batches(table_file, chunk_size)
+                    )
+                for batch in batches:
+                    await raw.executemany(insert, batch)
+                    rows += len(batch)
+
+            expected = manifest["tables"][table_name]
+            if rows != expected:
+                raise ValueError(
+                    f"Loaded {rows} {table_name} rows but the snapshot manifest lists {expected}"
+                )
+            timings[table_name] = (rows, time.perf_counter() - started)
+
+    return timings
@@ -0,0 +1,212 @@
+"""
+Statistics of a school database.
+Aggregates are computed with one GROUP BY scan of `students` and one of
+`enrollments`, run concurrently on pooled connections, or read from the
+`school_summary` table refreshed at the end of every load.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SUMMARY_TABLE = "school_summary"
+
+# One row per class (students) or per course (enrollments)
+SUMMARY_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+        table_name VARCHAR(20) NOT NULL,
+        group_id INTEGER NOT NULL,
+        row_count BIGINT NOT NULL,
+        gpa_sum DECIMAL(14,2),
+        gpa_count BIGINT,
+        PRIMARY KEY (table_name, group_id)
+    )
+"""
+
+# (group_id, row_count, gpa_sum, gpa_count) per summarized table
+GROUP_QUERIES = {
+    "students": """
+        SELECT class_id, COUNT(*), SUM(gpa), COUNT(gpa)
+        FROM students
+        GROUP BY class_id
+    """,
+    "enrollments": """
+        SELECT course_id, COUNT(*), CAST(NULL AS DECIMAL(14,2)), CAST(NULL AS BIGINT)
+        FROM enrollments
+        GROUP BY course_id
+    """,
+}
+
+TOP_COURSES = 5
+
+
+@dataclass
+class ClassStatistics:
+    class_code: str
+    class_name: str
+    students: int
+    avg_gpa: Optional[float]
+
+
+@dataclass
+class CourseStatistics:
+    course_name: str
+    enrollments: int
+
+
+@dataclass
+class Statistics:
+    """Everything shown by print_statistics, serializable with `to_json`."""
+
+    source: str
+    elapsed: float
+    totals: Dict[str, int]
+    classes: List[ClassStatistics] = field(default_factory=list)
+    top_courses: List[CourseStatistics] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2)
+
+
+async def _fetch_all(engine: AsyncEngine, sql: str) -> Sequence[Any]:
+    """Run `sql` on its own pooled connection and return every row."""
+    async with engine.connect() as conn:
+        result = await conn.execute(text(sql))
+        return result.all()
+
+
+async def has_summary(engine: AsyncEngine) -> bool:
+    """Return True if the summary table exists."""
+    async with engine.connect() as conn:
+        return await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).has_table(SUMMARY_TABLE)
+        )
+
+
+async def refresh_summary(
+    engine: AsyncEngine, after_student_id: Optional[int] = None
+) -> None:
+    """Recompute the summary table from `students` and `enrollments`.
+
+    With `after_student_id`, only students above that id and their
+    enrollments are aggregated and added to the stored groups, so that an
+    append does not rescan the existing rows. A missing summary is rebuilt.
+    """
+    if after_student_id is not None and not await has_summary(engine):
+        after_student_id = None
+
+    async with engine.begin() as conn:
+        if after_student_id is None:
+            await conn.execute(text(SUMMARY_TABLE_SQL))
+            await conn.execute(text(f"DELETE FROM {SUMMARY_TABLE}"))
+        for table_name, query in GROUP_QUERIES.items():
+            if after_student_id is None:
+                upsert = ""
+            else:
+                column = "id" if table_name == "students" else "student_id"
+                query = query.replace(
+                    "GROUP BY", f"WHERE {column} > {int(after_student_id)}\n        GROUP BY"
+                )
+                # WHERE true: SQLite needs it to parse ON CONFLICT after a SELECT
+                upsert = f"""
+                WHERE true
+                ON CONFLICT (table_name, group_id) DO UPDATE SET
+                    row_count = {SUMMARY_TABLE}.row_count + excluded.row_count,
+                    gpa_sum = {SUMMARY_TABLE}.gpa_sum + excluded.gpa_sum,
+                    gpa_count = {SUMMARY_TABLE}.gpa_count + excluded.gpa_count
+                """
+            await conn.execute(
+                text(f"""
+                INSERT INTO {SUMMARY_TABLE} (table_name, group_id, row_count, gpa_sum, gpa_count)
+                SELECT '{table_name}', groups.*
+                FROM ({query}) AS groups{upsert}
+            """)
+            )
+
+
+async def collect_statistics(engine: AsyncEngine, use_summary: bool = True) -> Statistics:
+    """Compute the database statistics with every query running concurrently.
+
+    With `use_summary`, per-class and per-course counts are read from the
+    summary table when it exists instead of scanning the large tables.
+    """
+    started = time.perf_counter()
+    source = "summary" if use_summary and await has_summary(engine) else "scan"
+    if source == "summary":
+        group_queries = [
+            f"""
+            SELECT group_id, row_count, gpa_sum, gpa_count
+            FROM {SUMMARY_TABLE}
+            WHERE table_name = '{table_name}'
+            """
+            for table_name in GROUP_QUERIES
+        ]
+    else:
+        group_queries = list(GROUP_QUERIES.values())
+
+    classes, courses, student_groups, enrollment_groups = await asyncio.gather(
+        _fetch_all(engine, "SELECT id, class_code, class_name FROM classes ORDER BY id"),
+        _fetch_all(engine, "SELECT id, course_name FROM courses ORDER BY id"),
+        *(_fetch_all(engine, query) for query in group_queries),
+    )
+
+    students = {row[0]: row for row in student_groups}
+    enrollments = {row[0]: row[1] for row in enrollment_groups}
+
+    class_statistics = []
+    for class_id, class_code, class_name in classes:
+        _, count, gpa_sum, gpa_count = students.get(class_id, (class_id, 0, None, 0))
+        avg_gpa = round(float(gpa_sum) / gpa_count, 2) if gpa_count else None
+        class_statistics.append(ClassStatistics(class_code, class_name, count, avg_gpa))
+
+    course_statistics = [
+        CourseStatistics(course_name, enrollments.get(course_id, 0))
+        for course_id, course_name in courses
+    ]
+    # Stable sort: ties keep course id order
+    top_courses = sorted(course_statistics, key=lambda course: -course.enrollments)
+
+    return Statistics(
+        source=source,
+        elapsed=round(time.perf_counter() - started, 3),
+        totals={
+            "classes": len(classes),
+            "courses": len(courses),
+            "students": sum(row[1] for row in student_groups),
+            "enrollments": sum(enrollments.values()),
+        },
+        classes=class_statistics,
+        top_courses=top_courses[:TOP_COURSES],
+    )
+
+
+def print_statistics(statistics: Statistics) -> None:
+    """Print database statistics."""
+    print("\n" + "=" * 60)
+    print("DATABASE STATISTICS")
+    print("=" * 60)
+
+    print(f"Total Classes: {statistics.totals['classes']}")
+    print(f"Total Courses: {statistics.totals['courses']}")
+    print(f"Total Students: {statistics.totals['students']}")
+    print(f"Total Enrollments: {statistics.totals['enrollments']}")
+
+    print("\nStudents per class:")
+    for row in statistics.classes:
+        print(f"  {row.class_code} ({row.class_name}): {row.students} students")
+
+    print("\nAverage GPA per class:")
+    for row in statistics.classes:
+        print(f"  {row.class_code}: {'None' if row.avg_gpa is None else f'{row.avg_gpa:.2f}'}")
+
+    print(f"\nTop {TOP_COURSES} most popular courses:")
+    for row in statistics.top_courses:
+        print(f"  {row.course_name}: {row.enrollments} enrollments")
+
+    print(f"\n(computed from {statistics.source} in {statistics.elapsed:.2f}s)")
+    print("=" * 60)
@@ -0,0 +1,216 @@
+"""
+Read-optimization layer of a school database.
+Adds secondary indexes on the join and filter columns and denormalized
+student transcript and course roster views: materialized views on
+PostgreSQL, tables maintained by refresh_read_layer on SQLite.
+"""
+
+import random
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# (table, index name, columns); the first two are also built by --fast-load
+READ_INDEXES = [
+    ("students", "idx_students_class_id", "class_id"),
+    ("enrollments", "idx_enrollments_course_id", "course_id"),
+    ("students", "idx_students_class_name", "class_id, last_name, first_name"),
+    ("enrollments", "idx_enrollments_student_date", "student_id, enrollment_date"),
+]
+
+# view name -> (defining query, index name, indexed columns)
+READ_VIEWS = {
+    "student_transcripts": (
+        """
+        SELECT e.id AS enrollment_id,
+               e.student_id,
+               s.student_id AS student_code,
+               s.first_name,
+               s.last_name,
+               c.id AS course_id,
+               c.course_name,
+               c.credits,
+               e.enrollment_date,
+               e.grade,
+               e.status
+        FROM enrollments e
+        JOIN students s ON s.id = e.student_id
+        JOIN courses c ON c.id = e.course_id
+        """,
+        "idx_student_transcripts_student",
+        "student_id, enrollment_date",
+    ),
+    "course_rosters": (
+        """
+        SELECT e.course_id,
+               c.course_name,
+               e.student_id,
+               s.student_id AS student_code,
+               s.first_name,
+               s.last_name,
+               s.email,
+               cl.class_code,
+               e.status
+        FROM enrollments e
+        JOIN students s ON s.id = e.student_id
+        JOIN courses c ON c.id = e.course_id
+        JOIN classes cl ON cl.id = s.class_id
+        """,
+        "idx_course_rosters_course",
+        "course_id, last_name, first_name",
+    ),
+}
+
+# Representative reads as (name, parameter, query on the base tables,
+# query using the read layer)
+READ_QUERIES = [
+    (
+        "class_roster",
+        "class_id",
+        """
+        SELECT id, student_id, first_name, last_name
+        FROM students
+        WHERE class_id = :class_id
+        ORDER BY last_name, first_name
+        LIMIT 100
+        """,
+        None,
+    ),
+    (
+        "class_size",
+        "class_id",
+        "SELECT COUNT(*) FROM students WHERE class_id = :class_id",
+        None,
+    ),
+    (
+        "transcript",
+        "student_id",
+        """
+        SELECT c.course_name, c.credits, e.enrollment_date, e.grade, e.status
+        FROM enrollments e
+        JOIN courses c ON c.id = e.course_id
+        WHERE e.student_id = :student_id
+        ORDER BY e.enrollment_date
+        """,
+        """
+        SELECT course_name, credits, enrollment_date, grade, status
+        FROM student_transcripts
+        WHERE student_id = :student_id
+        ORDER BY enrollment_date
+        """,
+    ),
+    (
+        "course_roster",
+        "course_id",
+        """
+        SELECT s.student_id, s.first_name, s.last_name, cl.class_code, e.status
+        FROM enrollments e
+        JOIN students s ON s.id = e.student_id
+        JOIN classes cl ON cl.id = s.class_id
+        WHERE e.course_id = :course_id
+        ORDER BY s.last_name, s.first_name
+        LIMIT 100
+        """,
+        """
+        SELECT student_code, first_name, last_name, class_code, status
+        FROM course_rosters
+        WHERE course_id = :course_id
+        ORDER BY last_name, first_name
+        LIMIT 100
+        """,
+    ),
+]
+
+# Runs of every representative query (with different parameters) per timing
+TIMING_RUNS = 10
+
+
+async def has_read_layer(engine: AsyncEngine) -> bool:
+    """Return True if the read views have been built."""
+    async with engine.connect() as conn:
+        return await conn.run_sync(
+            lambda sync_conn: all(
+                name in inspect(sync_conn).get_materialized_view_names()
+                if sync_conn.dialect.name == "postgresql"
+                else inspect(sync_conn).has_table(name)
+                for name in READ_VIEWS
+            )
+        )
+
+
+async def build_read_layer(engine: AsyncEngine, is_pg: bool) -> None:
+    """Create the secondary indexes and the read views, then fill the views."""
+    async with engine.begin() as conn:
+        for table_name, name, columns in READ_INDEXES:
+            await conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})")
+            )
+        for view_name, (query, index_name, columns) in READ_VIEWS.items():
+            if is_pg:
+                await conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view_name}"))
+                await conn.execute(text(f"CREATE MATERIALIZED VIEW {view_name} AS {query}"))
+            else:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {view_name}"))
+                await conn.execute(text(f"CREATE TABLE {view_name} AS {query}"))
+            await conn.execute(text(f"CREATE INDEX {index_name} ON {view_name} ({columns})"))
+        if is_pg:
+            # Fresh materialized views have no statistics until analyzed
+            for view_name in READ_VIEWS:
+                await conn.execute(text(f"ANALYZE {view_name}"))
+
+
+async def refresh_read_layer(engine: AsyncEngine, is_pg: bool) -> None:
+    """Recompute the read views from the base tables."""
+    async with engine.begin() as conn:
+        for view_name, (query, _, _) in READ_VIEWS.items():
+            if is_pg:
+                await conn.execute(text(f"REFRESH MATERIALIZED VIEW {view_name}"))
+            else:
+                await conn.execute(text(f"DELETE FROM {view_name}"))
+                await conn.execute(text(f"INSERT INTO {view_name} {query}"))
+
+
+async def time_read_queries(
+    engine: AsyncEngine, use_read_layer: bool, seed: Optional[int] = None
+) -> Dict[str, float]:
+    """Return the median latency in ms of every representative query.
+
+    With `use_read_layer`, queries that have a read-view variant use it.
+    """
+    rng = random.Random(seed)
+    async with engine.connect() as conn:
+        parameters: Dict[str, List[int]] = {}
+        for name, table_name in (
+            ("class_id", "classes"),
+            ("student_id", "students"),
+            ("course_id", "courses"),
+        ):
+            result = await conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}"))
+            max_id = result.scalar_one()
+            parameters[name] = [rng.randint(1, max(max_id, 1)) for _ in range(TIMING_RUNS)]
+
+        timings = {}
+        for name, parameter, base_query, view_query in READ_QUERIES:
+            statement = text(view_query if use_read_layer and view_query else base_query)
+            samples = []
+            for value in parameters[parameter]:
+                started = time.perf_counter()
+                result = await conn.execute(statement, {parameter: value})
+                result.all()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(samples)
+    return timings
+
+
+def print_read_timings(before: Dict[str, float], after: Dict[str, float]) -> None:
+    """Print the before/after latency of the representative queries."""
+    print(f"\n{'query':<16} {'before ms':>10} {'after ms':>10} {'speedup':>9}")
+    for name, before_ms in before.items():
+        after_ms = after[name]
+        print(
+            f"{name:<16} {before_ms:>10.2f} {after_ms:>10.2f} "
+            f"{before_ms / max(after_ms, 1e-6):>8.1f}x"
+        )